@@ -11,11 +11,12 @@ Author: Adhyantha Chandrasekaran
 Date: February 2025
 """
 
+import argparse
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.pyplot as plt
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
 from qiskit.quantum_info import Statevector
 
 
@@ -34,6 +35,9 @@ class CounterfactualCommunication:
         Number of inner cycle iterations (transmission channel)
     """
     
+    # Shared Aer backend, created on first use (see _get_simulator)
+    _simulator = None
+    
     def __init__(self, M=4, N=4):
         self.M = M
         self.N = N
@@ -43,7 +47,26 @@ class CounterfactualCommunication:
         # Calculate theoretical leakage probability
         self.leakage_prob = (np.pi / (16 * M * N)) ** 2
         
-    def create_circuit(self, bob_blocks=False, measure=True):
+        # Bob's Pockels Cell (Pauli-X) as a gate matrix
+        self._X = np.array([[0, 1], [1, 0]], dtype=complex)
+        
+        # Fused path operators: consecutive RY gates add their angles, so
+        # each leg of the circuit collapses to one 2x2 matrix. Bob's X acts
+        # after inner cycle N//2, splitting the forward inner leg in two.
+        self._U_outer = _ry_matrix(M * self.theta_M)
+        self._U_fwd_pass = _ry_matrix(N * self.theta_N)
+        self._U_fwd_block = (_ry_matrix((N - N // 2 - 1) * self.theta_N)
+                             @ self._X
+                             @ _ry_matrix((N // 2 + 1) * self.theta_N))
+        self._U_rev = self._U_outer.T @ self._U_fwd_pass.T
+        
+        # Whole-circuit operator for each of Bob's choices
+        self._U_total = {
+            False: self._U_rev @ self._U_fwd_pass @ self._U_outer,
+            True: self._U_rev @ self._U_fwd_block @ self._U_outer,
+        }
+        
+    def create_circuit(self, bob_blocks=False, measure=True, with_barriers=False):
         """
         Create quantum circuit for counterfactual communication.
         
@@ -54,54 +77,19 @@ class CounterfactualCommunication:
             If False, Bob passes (PC off, reflects H)
         measure : bool
             If True, add measurement at end of circuit
+        with_barriers : bool
+            If True, add a labeled barrier after every cycle (for drawing)
             
         Returns
         -------
         QuantumCircuit
             Qiskit circuit implementing the protocol
         """
-        qr = QuantumRegister(1, 'photon')
-        cr = ClassicalRegister(1, 'detector')
-        qc = QuantumCircuit(qr, cr)
-        
-        # Initial state: |H⟩ = |0⟩ (horizontal polarization)
-        
-        # ===== OUTER CYCLE (M cycles) - Alice's interferometer =====
-        for cycle in range(self.M):
-            qc.ry(2 * self.theta_M, qr[0])
-            qc.barrier(label=f'Outer{cycle+1}')
-        
-        # ===== INNER CYCLE (N cycles) - Transmission channel =====
-        for cycle in range(self.N):
-            qc.ry(2 * self.theta_N, qr[0])
-            
-            # Bob's Pockels Cell acts at mid-transmission
-            if cycle == self.N // 2:
-                if bob_blocks:
-                    qc.x(qr[0])  # Pauli-X: H ↔ V flip
-                    qc.barrier(label='Bob_BLOCKS')
-                else:
-                    qc.barrier(label='Bob_PASS')
-            else:
-                qc.barrier(label=f'Inner{cycle+1}')
-        
-        # ===== RETURN PATH - Reverse inner cycle =====
-        for cycle in range(self.N):
-            qc.ry(-2 * self.theta_N, qr[0])
-            qc.barrier(label=f'RetInner{cycle+1}')
-        
-        # ===== RETURN PATH - Reverse outer cycle =====
-        for cycle in range(self.M):
-            qc.ry(-2 * self.theta_M, qr[0])
-            qc.barrier(label=f'RetOuter{cycle+1}')
-        
-        # Measurement at detectors
-        if measure:
-            qc.measure(qr[0], cr[0])
-        
-        return qc
+        return _create_circuit(self.M, self.N, self.theta_M, self.theta_N,
+                               bob_blocks, measure, with_barriers)
     
-    def run_simulation(self, bob_blocks=False, shots=1000):
+    def run_simulation(self, bob_blocks=False, shots=1000, analytic=True,
+                       use_aer=False, as_statevector=True):
         """
         Run the counterfactual communication simulation.
         
@@ -111,30 +99,54 @@ class CounterfactualCommunication:
             Bob's bit (0=pass, 1=block)
         shots : int
             Number of measurement repetitions
+        analytic : bool
+            If True, evaluate the single-qubit circuit directly with NumPy.
+            If False, simulate the Qiskit circuit with Statevector.
+        use_aer : bool
+            If True, run the measured circuit on Aer to get the counts.
+            If False, sample the counts from the final statevector.
+        as_statevector : bool
+            If True, return the final state as a Qiskit Statevector,
+            otherwise as a complex array of (H, V) amplitudes
             
         Returns
         -------
         tuple
             (circuit, measurement_counts, final_statevector)
         """
-        # Create circuit with measurement
-        qc = self.create_circuit(bob_blocks, measure=True)
-        
-        # Use Aer simulator
-        simulator = AerSimulator()
+        # Circuit with measurement (a copy, so callers can't alter the cache)
+        qc = _build_circuit(self.M, self.N, self.theta_M, self.theta_N,
+                            bob_blocks, measure=True).copy()
         
-        # Execute circuit
-        job = simulator.run(qc, shots=shots)
-        result = job.result()
-        counts = result.get_counts()
+        # Final state (without measurement)
+        if analytic:
+            psi = self._analytic_final_state(bob_blocks)
+        else:
+            qc_no_measure = _build_circuit(self.M, self.N, self.theta_M,
+                                           self.theta_N, bob_blocks, measure=False)
+            psi = Statevector.from_instruction(qc_no_measure).data
         
-        # Get final statevector (without measurement)
-        qc_no_measure = self.create_circuit(bob_blocks, measure=False)
-        statevector = Statevector.from_instruction(qc_no_measure)
+        if use_aer:
+            job = self._get_simulator().run(qc, shots=shots)
+            counts = job.result().get_counts()
+        else:
+            # The measured circuit only differs by the final measure
+            counts = _sample_counts(psi, shots)
         
-        return qc, counts, statevector
-    
-    def get_state_evolution(self, bob_blocks=False):
+        if as_statevector:
+            return qc, counts, Statevector(psi)
+        return qc, counts, psi
+    
+    @classmethod
+    def _get_simulator(cls):
+        """Return the shared AerSimulator, creating it on first use."""
+        if cls._simulator is None:
+            cls._simulator = AerSimulator(method='statevector',
+                                          max_parallel_experiments=1,
+                                          fusion_enable=True)
+        return cls._simulator
+    
+    def get_state_evolution(self, bob_blocks=False, as_statevectors=False):
         """
         Track quantum state evolution through each gate.
         
@@ -142,41 +154,54 @@ class CounterfactualCommunication:
         ----------
         bob_blocks : bool
             Bob's bit (0=pass, 1=block)
+        as_statevectors : bool
+            If True, wrap each step as a Qiskit Statevector
             
         Returns
         -------
-        list
-            List of Statevector objects at each circuit step
+        np.ndarray or list
+            complex64 array of shape (2*(M+N)+1, 2), one state per circuit
+            step, or a list of Statevector objects if as_statevectors is True
         """
-        states = []
-        
-        # Build circuit incrementally
-        qc = QuantumCircuit(1)
-        states.append(Statevector.from_instruction(qc))
-        
-        # Outer cycle
-        for cycle in range(self.M):
-            qc.ry(2 * self.theta_M, 0)
-            states.append(Statevector.from_instruction(qc))
-        
-        # Inner cycle (forward)
-        for cycle in range(self.N):
-            qc.ry(2 * self.theta_N, 0)
-            if cycle == self.N // 2 and bob_blocks:
-                qc.x(0)
-            states.append(Statevector.from_instruction(qc))
-        
-        # Return path - inner
-        for cycle in range(self.N):
-            qc.ry(-2 * self.theta_N, 0)
-            states.append(Statevector.from_instruction(qc))
+        states = self._analytic_trace(bob_blocks)
+        if as_statevectors:
+            return [Statevector(vec) for vec in states]
+        return states
+    
+    def _analytic_trace(self, bob_blocks=False):
+        """
+        Evolve |H⟩ through the circuit schedule with plain 2x2 matrices.
         
-        # Return path - outer
-        for cycle in range(self.M):
-            qc.ry(-2 * self.theta_M, 0)
-            states.append(Statevector.from_instruction(qc))
+        Parameters
+        ----------
+        bob_blocks : bool
+            Bob's bit (0=pass, 1=block)
+            
+        Returns
+        -------
+        np.ndarray
+            complex64 array of shape (2*(M+N)+1, 2), one state per circuit step
+        """
+        # The cached trace is shared, so hand out a copy
+        return _analytic_trace_impl(int(self.M), int(self.N),
+                                    float(self.theta_M), float(self.theta_N),
+                                    bool(bob_blocks)).copy()
+    
+    def _analytic_final_state(self, bob_blocks=False):
+        """
+        Compute the final state with one matrix-vector product.
         
-        return states
+        Parameters
+        ----------
+        bob_blocks : bool
+            Bob's bit (0=pass, 1=block)
+            
+        Returns
+        -------
+        np.ndarray
+            Complex amplitudes (H, V) of the state before measurement
+        """
+        return self._U_total[bool(bob_blocks)] @ np.array([1.0 + 0j, 0.0 + 0j])
     
     def analyze_results(self, counts, shots=1000):
         """
@@ -184,26 +209,192 @@ class CounterfactualCommunication:
         
         Parameters
         ----------
-        counts : dict
-            Measurement counts from Qiskit
+        counts : dict or np.ndarray
+            Measurement counts from Qiskit, or a length-2 array of
+            (|H⟩, |V⟩) counts
         shots : int
             Total number of shots
         """
-        h_count = counts.get('0', 0)
-        v_count = counts.get('1', 0)
+        if isinstance(counts, dict):
+            h_count, v_count = counts.get('0', 0), counts.get('1', 0)
+        else:
+            h_count, v_count = int(counts[0]), int(counts[1])
+        inv_shots = 100.0 / shots
         
-        print(f"  D₃ (|H⟩ = |0⟩): {h_count} ({100*h_count/shots:.1f}%)")
-        print(f"  D₁/D₂ (|V⟩ = |1⟩): {v_count} ({100*v_count/shots:.1f}%)")
+        print(f"  D₃ (|H⟩ = |0⟩): {h_count} ({h_count*inv_shots:.1f}%)")
+        print(f"  D₁/D₂ (|V⟩ = |1⟩): {v_count} ({v_count*inv_shots:.1f}%)")
         
         return h_count, v_count
 
 
-def main():
-    """Main function to run the simulation and generate plots."""
+def _ry_matrix(theta):
+    """RY(2θ) as a 2x2 matrix: [[cos θ, -sin θ], [sin θ, cos θ]]."""
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, -s], [s, c]], dtype=complex)
+
+
+def _evolve(M, N, theta_M, theta_N, bob_blocks):
+    """Evolve |H⟩ through the circuit schedule, recording every step."""
+    # The trace is only used for plotting probabilities, so it is stored in
+    # single precision; amplitudes are still propagated in double precision
+    states = np.empty((2 * (M + N) + 1, 2), dtype=np.complex64)
+    c_M, s_M = np.cos(theta_M), np.sin(theta_M)
+    c_N, s_N = np.cos(theta_N), np.sin(theta_N)
+    
+    # Initial state: |H⟩ = |0⟩
+    h = 1.0 + 0.0j
+    v = 0.0 + 0.0j
+    step = 0
+    states[step, 0] = h
+    states[step, 1] = v
+    
+    # Outer cycle: RY(2θ_M)
+    for cycle in range(M):
+        h, v = c_M * h - s_M * v, s_M * h + c_M * v
+        step += 1
+        states[step, 0] = h
+        states[step, 1] = v
+    
+    # Inner cycle (forward): RY(2θ_N), split around Bob's Pockels Cell
+    for cycle in range(N // 2):
+        h, v = c_N * h - s_N * v, s_N * h + c_N * v
+        step += 1
+        states[step, 0] = h
+        states[step, 1] = v
+    
+    # Bob acts at mid-transmission (Pauli-X if he blocks)
+    h, v = c_N * h - s_N * v, s_N * h + c_N * v
+    if bob_blocks:
+        h, v = v, h
+    step += 1
+    states[step, 0] = h
+    states[step, 1] = v
+    
+    for cycle in range(N // 2 + 1, N):
+        h, v = c_N * h - s_N * v, s_N * h + c_N * v
+        step += 1
+        states[step, 0] = h
+        states[step, 1] = v
+    
+    # Return path - inner: RY(-2θ_N)
+    for cycle in range(N):
+        h, v = c_N * h + s_N * v, -s_N * h + c_N * v
+        step += 1
+        states[step, 0] = h
+        states[step, 1] = v
+    
+    # Return path - outer: RY(-2θ_M)
+    for cycle in range(M):
+        h, v = c_M * h + s_M * v, -s_M * h + c_M * v
+        step += 1
+        states[step, 0] = h
+        states[step, 1] = v
+    
+    return states
+
+
+@lru_cache(maxsize=4)
+def _analytic_trace_impl(M, N, theta_M, theta_N, bob_blocks):
+    """Compute the state trace once per (M, N, θ_M, θ_N, bob_blocks)."""
+    states = _evolve(M, N, theta_M, theta_N, bob_blocks)
+    states.flags.writeable = False
+    return states
+
+
+def _create_circuit(M, N, theta_M, theta_N, bob_blocks, measure, with_barriers):
+    """Build the protocol circuit (see CounterfactualCommunication.create_circuit)."""
+    qr = QuantumRegister(1, 'photon')
+    cr = ClassicalRegister(1, 'detector')
+    qc = QuantumCircuit(qr, cr)
+    
+    # Initial state: |H⟩ = |0⟩ (horizontal polarization)
+    
+    # ===== OUTER CYCLE (M cycles) - Alice's interferometer =====
+    for cycle in range(M):
+        qc.ry(2 * theta_M, qr[0])
+        if with_barriers:
+            qc.barrier(label=f'Outer{cycle+1}')
+    
+    # ===== INNER CYCLE (N cycles) - Transmission channel =====
+    for cycle in range(N):
+        qc.ry(2 * theta_N, qr[0])
+        
+        # Bob's Pockels Cell acts at mid-transmission
+        if cycle == N // 2:
+            if bob_blocks:
+                qc.x(qr[0])  # Pauli-X: H ↔ V flip
+                if with_barriers:
+                    qc.barrier(label='Bob_BLOCKS')
+            elif with_barriers:
+                qc.barrier(label='Bob_PASS')
+        elif with_barriers:
+            qc.barrier(label=f'Inner{cycle+1}')
+    
+    # ===== RETURN PATH - Reverse inner cycle =====
+    for cycle in range(N):
+        qc.ry(-2 * theta_N, qr[0])
+        if with_barriers:
+            qc.barrier(label=f'RetInner{cycle+1}')
+    
+    # ===== RETURN PATH - Reverse outer cycle =====
+    for cycle in range(M):
+        qc.ry(-2 * theta_M, qr[0])
+        if with_barriers:
+            qc.barrier(label=f'RetOuter{cycle+1}')
+    
+    # Measurement at detectors
+    if measure:
+        qc.measure(qr[0], cr[0])
+    
+    return qc
+
+
+@lru_cache(maxsize=32)
+def _build_circuit(M, N, theta_M, theta_N, bob_blocks, measure):
+    """
+    Build the barrier-free protocol circuit once per parameter set.
+    
+    The cached circuit is shared; copy it before handing it to callers.
+    """
+    return _create_circuit(M, N, theta_M, theta_N, bob_blocks, measure,
+                           with_barriers=False)
+
+
+def _count_dict(counts):
+    """Return counts as a Qiskit-style dict, converting (|H⟩, |V⟩) arrays."""
+    if isinstance(counts, dict):
+        return counts
+    return {'0': int(counts[0]), '1': int(counts[1])}
+
+
+def _sample_counts(vec, shots):
+    """Draw all measurement shots from |ψ|² in a single multinomial call."""
+    probs = np.abs(vec) ** 2
+    counts_arr = np.random.multinomial(shots, probs / probs.sum())
+    return {'0': int(counts_arr[0]), '1': int(counts_arr[1])}
+
+
+def main(analytic=True, use_aer=False, plots=True, high_quality=False):
+    """
+    Main function to run the simulation and generate plots.
+    
+    Parameters
+    ----------
+    analytic : bool
+        If True, evaluate the circuit with NumPy instead of Qiskit
+    use_aer : bool
+        If True, get the detection counts from the Aer simulator
+    plots : bool
+        If False, skip the state evolution and all plotting
+    high_quality : bool
+        If True, save the results figure at 300 dpi instead of 120
+    """
     
     print("="*60)
     print("COUNTERFACTUAL QUANTUM COMMUNICATION SIMULATION")
-    print("Using Qiskit + Aer Simulator")
+    engine = "NumPy (analytic)" if analytic else "Qiskit Statevector"
+    sampler = "Aer Simulator" if use_aer else "multinomial sampling"
+    print(f"Using {engine} + {sampler}")
     print("Chained Quantum Zeno Effect (CQZE)")
     print("="*60)
     
@@ -221,7 +412,9 @@ def main():
     print("\n" + "="*60)
     print("📡 SCENARIO 1: Bob's PC is OFF (Bob passes photon back)")
     print("="*60)
-    qc_pass, counts_pass, state_pass = comm.run_simulation(bob_blocks=False, shots=1000)
+    qc_pass, counts_pass, state_pass = comm.run_simulation(bob_blocks=False, shots=1000,
+                                                             analytic=analytic,
+                                                             use_aer=use_aer)
     
     print("Detection Results:")
     h_pass, v_pass = comm.analyze_results(counts_pass, shots=1000)
@@ -231,41 +424,60 @@ def main():
     print("\n" + "="*60)
     print("🚫 SCENARIO 2: Bob's PC is ON (Bob blocks photon)")
     print("="*60)
-    qc_block, counts_block, state_block = comm.run_simulation(bob_blocks=True, shots=1000)
+    qc_block, counts_block, state_block = comm.run_simulation(bob_blocks=True, shots=1000,
+                                                                analytic=analytic,
+                                                                use_aer=use_aer)
     
     print("Detection Results:")
     h_block, v_block = comm.analyze_results(counts_block, shots=1000)
     print(f"Final state: {state_block}")
     
-    # Get state evolution
-    print("\nComputing state evolution...")
-    states_pass = comm.get_state_evolution(bob_blocks=False)
-    states_block = comm.get_state_evolution(bob_blocks=True)
-    
-    # Create visualizations
-    print("Generating visualizations...")
-    create_visualizations(comm, counts_pass, counts_block, 
-                         states_pass, states_block,
-                         h_pass, v_pass, h_block, v_block,
-                         qc_pass, qc_block)
+    if plots:
+        # Get state evolution
+        print("\nComputing state evolution...")
+        states_pass = comm.get_state_evolution(bob_blocks=False)
+        states_block = comm.get_state_evolution(bob_blocks=True)
+        
+        # Create visualizations (labeled circuits for display)
+        print("Generating visualizations...")
+        qc_pass = comm.create_circuit(bob_blocks=False, with_barriers=True)
+        qc_block = comm.create_circuit(bob_blocks=True, with_barriers=True)
+        create_visualizations(comm, counts_pass, counts_block, 
+                             states_pass, states_block,
+                             h_pass, v_pass, h_block, v_block,
+                             qc_pass, qc_block, high_quality=high_quality)
     
     print("\n" + "="*60)
     print("✓ Simulation complete!")
-    print("  Results saved to: counterfactual_results.png")
+    if plots:
+        print("  Results saved to: counterfactual_results.png")
     print("="*60)
 
 
 def create_visualizations(comm, counts_pass, counts_block, 
                          states_pass, states_block,
                          h_pass, v_pass, h_block, v_block,
-                         qc_pass, qc_block):
+                         qc_pass, qc_block, high_quality=False):
     """Create and save comprehensive visualization plots."""
+    import matplotlib.pyplot as plt
+    
+    # Counts may be dicts or (|H⟩, |V⟩) arrays, as in analyze_results
+    counts_pass = _count_dict(counts_pass)
+    counts_block = _count_dict(counts_block)
     
-    fig = plt.figure(figsize=(18, 12))
-    gs = fig.add_gridspec(4, 2, hspace=0.4, wspace=0.3)
+    dpi = 300 if high_quality else 120
+    
+    # Create all six axes in one pass; the summary and circuit rows span
+    # both columns
+    fig, axes = plt.subplot_mosaic([[1, 1],
+                                    [2, 3],
+                                    [4, 5],
+                                    [6, 6]],
+                                   figsize=(18, 12),
+                                   gridspec_kw={'hspace': 0.4, 'wspace': 0.3})
     
     # Plot 1: Detection histogram comparison
-    ax1 = fig.add_subplot(gs[0, :])
+    ax1 = axes[1]
     labels = ['Bob Passes\n(bit=0)', 'Bob Blocks\n(bit=1)']
     h_counts = [h_pass, h_block]
     v_counts = [v_pass, v_block]
@@ -292,21 +504,27 @@ def create_visualizations(comm, counts_pass, counts_block,
             ax1.text(bar.get_x() + bar.get_width()/2., height,
                     f'{int(height)}', ha='center', va='bottom', fontsize=10)
     
-    # Plot 2: Qiskit histogram - Bob passes
-    ax2 = fig.add_subplot(gs[1, 0])
-    plot_histogram(counts_pass, ax=ax2, color='blue', 
-                   title='Bob Passes: Measurement Results')
-    
-    # Plot 3: Qiskit histogram - Bob blocks
-    ax3 = fig.add_subplot(gs[1, 1])
-    plot_histogram(counts_block, ax=ax3, color='red', 
-                   title='Bob Blocks: Measurement Results')
+    # Plot 2: Measurement histogram - Bob passes (observed outcomes only)
+    ax2 = axes[2]
+    keys = sorted(k for k, count in counts_pass.items() if count)
+    bars = ax2.bar(keys, [counts_pass[k] for k in keys], color='blue')
+    ax2.bar_label(bars)
+    ax2.set_ylabel('Count')
+    ax2.set_title('Bob Passes: Measurement Results')
+    
+    # Plot 3: Measurement histogram - Bob blocks
+    ax3 = axes[3]
+    keys = sorted(k for k, count in counts_block.items() if count)
+    bars = ax3.bar(keys, [counts_block[k] for k in keys], color='red')
+    ax3.bar_label(bars)
+    ax3.set_ylabel('Count')
+    ax3.set_title('Bob Blocks: Measurement Results')
     
     # Plot 4: State evolution (Bob passes)
-    ax4 = fig.add_subplot(gs[2, 0])
+    ax4 = axes[4]
     steps = np.arange(len(states_pass))
-    probs_H_pass = [abs(s.data[0])**2 for s in states_pass]
-    probs_V_pass = [abs(s.data[1])**2 for s in states_pass]
+    probs = np.abs(states_pass)**2
+    probs_H_pass, probs_V_pass = probs[:, 0], probs[:, 1]
     
     ax4.plot(steps, probs_H_pass, 'b-', linewidth=2, label='P(|H⟩)', marker='o', markersize=4)
     ax4.plot(steps, probs_V_pass, 'r-', linewidth=2, label='P(|V⟩)', marker='s', markersize=4)
@@ -320,9 +538,9 @@ def create_visualizations(comm, counts_pass, counts_block,
     ax4.set_ylim(-0.1, 1.1)
     
     # Plot 5: State evolution (Bob blocks)
-    ax5 = fig.add_subplot(gs[2, 1])
-    probs_H_block = [abs(s.data[0])**2 for s in states_block]
-    probs_V_block = [abs(s.data[1])**2 for s in states_block]
+    ax5 = axes[5]
+    probs = np.abs(states_block)**2
+    probs_H_block, probs_V_block = probs[:, 0], probs[:, 1]
     
     ax5.plot(steps, probs_H_block, 'b-', linewidth=2, label='P(|H⟩)', marker='o', markersize=4)
     ax5.plot(steps, probs_V_block, 'r-', linewidth=2, label='P(|V⟩)', marker='s', markersize=4)
@@ -336,7 +554,7 @@ def create_visualizations(comm, counts_pass, counts_block,
     ax5.set_ylim(-0.1, 1.1)
     
     # Plot 6: Circuit diagram and parameters
-    ax6 = fig.add_subplot(gs[3, :])
+    ax6 = axes[6]
     ax6.axis('off')
     
     circuit_text = f"""
@@ -361,8 +579,9 @@ def create_visualizations(comm, counts_pass, counts_block,
              bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.7))
     
     plt.tight_layout()
-    plt.savefig('counterfactual_results.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig('counterfactual_results.png', dpi=dpi, bbox_inches='tight',
+                pil_kwargs={'optimize': False, 'compress_level': 1})
+    plt.close(fig)
     
     # Print circuits to console
     print("\n" + "="*60)
@@ -377,4 +596,16 @@ def create_visualizations(comm, counts_pass, counts_block,
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Counterfactual quantum communication simulation (CQZE)")
+    parser.add_argument('--qiskit', action='store_true',
+                        help="simulate the Qiskit circuit instead of the NumPy evaluator")
+    parser.add_argument('--aer', action='store_true',
+                        help="sample detection counts on the Aer simulator")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="skip state evolution plots and circuit drawings")
+    parser.add_argument('--high-quality', action='store_true',
+                        help="save the results figure at 300 dpi instead of 120")
+    args = parser.parse_args()
+    main(analytic=not args.qiskit, use_aer=args.aer,
+         plots=not args.no_plots, high_quality=args.high_quality)
@@ -10,21 +10,33 @@ Author: Adhyantha Chandrasekaran
 Date: February 2025
 """
 
-import matplotlib.pyplot as plt
+import argparse
+import hashlib
+import os
+import shutil
+
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import FancyBboxPatch, Circle, FancyArrowPatch, Polygon
 import numpy as np
 
 
+# Rendered diagrams are static, so they are drawn once and reused. Each
+# version of this module's source gets its own subdirectory, so edits to
+# the drawing code invalidate the cache.
+CACHE_ROOT = os.path.join(os.path.expanduser('~'), '.cache', 'counterfactual')
+DIAGRAM_FILES = ('network_visualization.png', 'schematic_diagram.png')
+
+
 def draw_component(ax, x, y, width, height, label, color, alpha=0.3):
-    """Draw a component box."""
+    """Label a component box and return its patch."""
     rect = FancyBboxPatch((x-width/2, y-height/2), width, height,
                           boxstyle="round,pad=0.05", 
                           edgecolor=color, facecolor=color,
                           alpha=alpha, linewidth=2)
-    ax.add_patch(rect)
     ax.text(x, y, label, ha='center', va='center', 
            fontsize=10, fontweight='bold')
+    return rect
 
 
 def draw_arrow(ax, x1, y1, x2, y2, color='black', style='solid', 
@@ -43,13 +55,13 @@ def draw_arrow(ax, x1, y1, x2, y2, color='black', style='solid',
 
 
 def draw_detector(ax, x, y, label, detected=False):
-    """Draw a detector."""
+    """Label a detector and return its patch."""
     color = 'red' if detected else 'gray'
     alpha = 0.8 if detected else 0.3
     circle = Circle((x, y), 0.15, facecolor=color, alpha=alpha, linewidth=2,
                    edgecolor='black')
-    ax.add_patch(circle)
     ax.text(x, y-0.4, label, ha='center', fontsize=9, fontweight='bold')
+    return circle
 
 
 def visualize_bob_passes(ax):
@@ -59,14 +71,15 @@ def visualize_bob_passes(ax):
     ax.axis('off')
     ax.set_title("Bob Passes (Bit = 0): Photon Path", 
                 fontsize=14, fontweight='bold', pad=20)
+    patches_list = []
     
     # Alice's section
-    draw_component(ax, 1.5, 6, 2, 1.2, 'Source\n& PBS', 'yellow')
+    patches_list.append(draw_component(ax, 1.5, 6, 2, 1.2, 'Source\n& PBS', 'yellow'))
     
     # Outer cycle components
-    draw_component(ax, 3, 4, 1.5, 1, 'SM₁', 'purple')
-    draw_component(ax, 3, 2.5, 1.5, 1, 'SPR₁', 'green')
-    draw_component(ax, 5, 3.25, 1.5, 1, 'PBS₃', 'lightblue')
+    patches_list.append(draw_component(ax, 3, 4, 1.5, 1, 'SM₁', 'purple'))
+    patches_list.append(draw_component(ax, 3, 2.5, 1.5, 1, 'SPR₁', 'green'))
+    patches_list.append(draw_component(ax, 5, 3.25, 1.5, 1, 'PBS₃', 'lightblue'))
     
     # Transmission channel
     channel_x = [5.5, 8.5, 8.5, 5.5]
@@ -74,22 +87,22 @@ def visualize_bob_passes(ax):
     channel = Polygon(list(zip(channel_x, channel_y)), 
                      edgecolor='orange', facecolor='orange', 
                      alpha=0.15, linewidth=3, linestyle='--')
-    ax.add_patch(channel)
+    patches_list.append(channel)
     ax.text(7, 5.2, 'Transmission Channel', fontsize=11, 
            fontweight='bold', ha='center', color='orange')
     
     # Inner cycle components
-    draw_component(ax, 6.5, 3.5, 1.5, 1, 'SM₂', 'purple')
-    draw_component(ax, 6.5, 2, 1.5, 1, 'SPR₂', 'green')
+    patches_list.append(draw_component(ax, 6.5, 3.5, 1.5, 1, 'SM₂', 'purple'))
+    patches_list.append(draw_component(ax, 6.5, 2, 1.5, 1, 'SPR₂', 'green'))
     
     # Bob's section
-    draw_component(ax, 9, 3, 1.5, 1.5, "Bob's PC\n(OFF)", 'lightgreen')
-    draw_component(ax, 9, 1, 1.5, 0.8, 'Mirror', 'gray')
+    patches_list.append(draw_component(ax, 9, 3, 1.5, 1.5, "Bob's PC\n(OFF)", 'lightgreen'))
+    patches_list.append(draw_component(ax, 9, 1, 1.5, 0.8, 'Mirror', 'gray'))
     
     # Detectors
-    draw_detector(ax, 1, 7, 'D₁', detected=False)
-    draw_detector(ax, 2, 7, 'D₂', detected=False)
-    draw_detector(ax, 1, 1, 'D₃', detected=True)  # This fires!
+    patches_list.append(draw_detector(ax, 1, 7, 'D₁', detected=False))
+    patches_list.append(draw_detector(ax, 2, 7, 'D₂', detected=False))
+    patches_list.append(draw_detector(ax, 1, 1, 'D₃', detected=True))  # This fires!
     
     # Draw photon path (forward - passes through)
     draw_arrow(ax, 1.5, 5.4, 1.5, 4.5, 'blue', 'solid', '|H⟩', 3)
@@ -114,6 +127,10 @@ def visualize_bob_passes(ax):
     ax.text(7, 0.3, '✓ Photon stays |H⟩\n✓ Detected at D₃\n✓ Alice knows: Bob passed (0)',
            fontsize=10, ha='center', 
            bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.7))
+    
+    # Boxes and detectors sit beneath the individually added arrows
+    ax.add_collection(PatchCollection(patches_list, match_original=True,
+                                      zorder=0.9))
 
 
 def visualize_bob_blocks(ax):
@@ -123,14 +140,15 @@ def visualize_bob_blocks(ax):
     ax.axis('off')
     ax.set_title("Bob Blocks (Bit = 1): Photon Path", 
                 fontsize=14, fontweight='bold', pad=20)
+    patches_list = []
     
     # Alice's section
-    draw_component(ax, 1.5, 6, 2, 1.2, 'Source\n& PBS', 'yellow')
+    patches_list.append(draw_component(ax, 1.5, 6, 2, 1.2, 'Source\n& PBS', 'yellow'))
     
     # Outer cycle components
-    draw_component(ax, 3, 4, 1.5, 1, 'SM₁', 'purple')
-    draw_component(ax, 3, 2.5, 1.5, 1, 'SPR₁', 'green')
-    draw_component(ax, 5, 3.25, 1.5, 1, 'PBS₃', 'lightblue')
+    patches_list.append(draw_component(ax, 3, 4, 1.5, 1, 'SM₁', 'purple'))
+    patches_list.append(draw_component(ax, 3, 2.5, 1.5, 1, 'SPR₁', 'green'))
+    patches_list.append(draw_component(ax, 5, 3.25, 1.5, 1, 'PBS₃', 'lightblue'))
     
     # Transmission channel (red for blocked)
     channel_x = [5.5, 8.5, 8.5, 5.5]
@@ -138,21 +156,21 @@ def visualize_bob_blocks(ax):
     channel = Polygon(list(zip(channel_x, channel_y)), 
                      edgecolor='red', facecolor='red', 
                      alpha=0.15, linewidth=3, linestyle='--')
-    ax.add_patch(channel)
+    patches_list.append(channel)
     ax.text(7, 5.2, 'Transmission Channel', fontsize=11, 
            fontweight='bold', ha='center', color='red')
     
     # Inner cycle components
-    draw_component(ax, 6.5, 3.5, 1.5, 1, 'SM₂', 'purple')
-    draw_component(ax, 6.5, 2, 1.5, 1, 'SPR₂', 'green')
+    patches_list.append(draw_component(ax, 6.5, 3.5, 1.5, 1, 'SM₂', 'purple'))
+    patches_list.append(draw_component(ax, 6.5, 2, 1.5, 1, 'SPR₂', 'green'))
     
     # Bob's section (PC ON - blocking)
-    draw_component(ax, 9, 3, 1.5, 1.5, "Bob's PC\n(ON)", 'salmon')
+    patches_list.append(draw_component(ax, 9, 3, 1.5, 1.5, "Bob's PC\n(ON)", 'salmon'))
     
     # Detectors
-    draw_detector(ax, 1, 7, 'D₁', detected=True)  # This fires!
-    draw_detector(ax, 2, 7, 'D₂', detected=False)
-    draw_detector(ax, 1, 1, 'D₃', detected=False)
+    patches_list.append(draw_detector(ax, 1, 7, 'D₁', detected=True))  # This fires!
+    patches_list.append(draw_detector(ax, 2, 7, 'D₂', detected=False))
+    patches_list.append(draw_detector(ax, 1, 1, 'D₃', detected=False))
     
     # Draw photon path (forward - blocked)
     draw_arrow(ax, 1.5, 5.4, 1.5, 4.5, 'blue', 'solid', '|H⟩', 3)
@@ -181,10 +199,16 @@ def visualize_bob_blocks(ax):
     ax.text(7, 0.3, '✓ Photon rotated to |V⟩\n✓ Detected at D₁/D₂\n✓ Alice knows: Bob blocked (1)',
            fontsize=10, ha='center',
            bbox=dict(boxstyle='round', facecolor='salmon', alpha=0.7))
+    
+    # Boxes and detectors sit beneath the individually added arrows
+    ax.add_collection(PatchCollection(patches_list, match_original=True,
+                                      zorder=0.9))
 
 
 def create_schematic():
     """Create simplified conceptual schematic diagram."""
+    import matplotlib.pyplot as plt
+    
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.set_xlim(0, 10)
     ax.set_ylim(0, 6)
@@ -274,17 +298,15 @@ def create_schematic():
            family='monospace')
     
     plt.tight_layout()
-    plt.savefig('schematic_diagram.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig('schematic_diagram.png', dpi=120, bbox_inches='tight',
+                pil_kwargs={'optimize': False, 'compress_level': 1})
+    plt.close(fig)
 
 
-def main():
-    """Generate all network visualizations."""
-    print("="*60)
-    print("GENERATING NETWORK VISUALIZATIONS")
-    print("="*60)
+def create_network_diagram():
+    """Create side-by-side photon path diagrams for both scenarios."""
+    import matplotlib.pyplot as plt
     
-    # Main network diagram
     fig, axes = plt.subplots(1, 2, figsize=(16, 8))
     
     visualize_bob_passes(axes[0])
@@ -298,14 +320,69 @@ def main():
              bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
     
     plt.tight_layout(rect=[0, 0.04, 1, 0.96])
-    plt.savefig('network_visualization.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig('network_visualization.png', dpi=120, bbox_inches='tight',
+                pil_kwargs={'optimize': False, 'compress_level': 1})
+    plt.close(fig)
+
+
+def diagram_cache_dir():
+    """Return the cache directory for the current drawing code."""
+    with open(__file__, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    return os.path.join(CACHE_ROOT, digest)
+
+
+def copy_file(src, dst):
+    """Copy src to dst unless both already name the same file."""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    shutil.copy(src, dst)
+
+
+def copy_cached_diagrams(cache_dir):
+    """Copy cached diagrams to the working directory if all are present."""
+    cached = [os.path.join(cache_dir, name) for name in DIAGRAM_FILES]
+    if not all(os.path.isfile(path) for path in cached):
+        return False
+    
+    for path in cached:
+        copy_file(path, os.path.basename(path))
+    return True
+
+
+def store_cached_diagrams(cache_dir):
+    """Save freshly drawn diagrams to the cache directory."""
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in DIAGRAM_FILES:
+        copy_file(name, os.path.join(cache_dir, name))
+
+
+def main(regenerate=False):
+    """
+    Generate all network visualizations.
     
-    print("✓ Network visualization saved: network_visualization.png")
+    Parameters
+    ----------
+    regenerate : bool
+        If True, redraw the diagrams even when cached copies exist
+    """
+    print("="*60)
+    print("GENERATING NETWORK VISUALIZATIONS")
+    print("="*60)
     
-    # Schematic diagram
-    create_schematic()
-    print("✓ Schematic diagram saved: schematic_diagram.png")
+    cache_dir = diagram_cache_dir()
+    if not regenerate and copy_cached_diagrams(cache_dir):
+        print(f"✓ Diagrams copied from cache: {cache_dir}")
+    else:
+        # Main network diagram
+        create_network_diagram()
+        print("✓ Network visualization saved: network_visualization.png")
+        
+        # Schematic diagram
+        create_schematic()
+        print("✓ Schematic diagram saved: schematic_diagram.png")
+        
+        store_cached_diagrams(cache_dir)
     
     print("\n" + "="*60)
     print("VISUALIZATION COMPLETE")
@@ -313,4 +390,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Network flow diagrams for counterfactual communication")
+    parser.add_argument('--regenerate-diagrams', action='store_true',
+                        help="redraw the diagrams instead of copying cached ones")
+    args = parser.parse_args()
+    main(regenerate=args.regenerate_diagrams)